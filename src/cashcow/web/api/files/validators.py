@@ -3,174 +3,173 @@ CashCow Web API - File and entity validation.
 """
 
 from datetime import date, datetime
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
 
 from cashcow.models.base import BaseEntity
 from pydantic import ValidationError
 
 
+# Entity validation schemas, built once at import and shared by all
+# validators. Read-only: the view blocks adding or replacing types, and
+# nothing mutates the nested schemas or hands them out uncopied
+ENTITY_TYPE_SCHEMAS: Mapping[str, Dict[str, Any]] = MappingProxyType({
+    "employee": {
+        "required_fields": ["type", "name", "start_date", "salary"],
+        "optional_fields": ["end_date", "position", "department", "overhead_multiplier", "tags", "notes"],
+        "field_types": {
+            "type": str,
+            "name": str,
+            "start_date": (str, date),
+            "end_date": (str, date, type(None)),
+            "salary": (int, float),
+            "position": (str, type(None)),
+            "department": (str, type(None)),
+            "overhead_multiplier": (int, float),
+            "tags": list,
+            "notes": (str, type(None))
+        },
+        "field_constraints": {
+            "salary": {"min": 0},
+            "overhead_multiplier": {"min": 1.0, "max": 3.0}
+        }
+    },
+    
+    "grant": {
+        "required_fields": ["type", "name", "start_date", "amount"],
+        "optional_fields": ["end_date", "agency", "program", "grant_number", "tags", "notes"],
+        "field_types": {
+            "type": str,
+            "name": str,
+            "start_date": (str, date),
+            "end_date": (str, date, type(None)),
+            "amount": (int, float),
+            "agency": (str, type(None)),
+            "program": (str, type(None)),
+            "grant_number": (str, type(None)),
+            "tags": list,
+            "notes": (str, type(None))
+        },
+        "field_constraints": {
+            "amount": {"min": 0}
+        }
+    },
+    
+    "investment": {
+        "required_fields": ["type", "name", "start_date", "amount"],
+        "optional_fields": ["end_date", "investor", "round_type", "pre_money_valuation", "tags", "notes"],
+        "field_types": {
+            "type": str,
+            "name": str,
+            "start_date": (str, date),
+            "end_date": (str, date, type(None)),
+            "amount": (int, float),
+            "investor": (str, type(None)),
+            "round_type": (str, type(None)),
+            "pre_money_valuation": (int, float, type(None)),
+            "tags": list,
+            "notes": (str, type(None))
+        },
+        "field_constraints": {
+            "amount": {"min": 0},
+            "pre_money_valuation": {"min": 0}
+        }
+    },
+    
+    "facility": {
+        "required_fields": ["type", "name", "start_date", "monthly_cost"],
+        "optional_fields": ["end_date", "location", "size_sqft", "facility_type", "tags", "notes"],
+        "field_types": {
+            "type": str,
+            "name": str,
+            "start_date": (str, date),
+            "end_date": (str, date, type(None)),
+            "monthly_cost": (int, float),
+            "location": (str, type(None)),
+            "size_sqft": (int, type(None)),
+            "facility_type": (str, type(None)),
+            "tags": list,
+            "notes": (str, type(None))
+        },
+        "field_constraints": {
+            "monthly_cost": {"min": 0},
+            "size_sqft": {"min": 0}
+        }
+    },
+    
+    "software": {
+        "required_fields": ["type", "name", "start_date", "monthly_cost"],
+        "optional_fields": ["end_date", "vendor", "license_count", "annual_cost", "tags", "notes"],
+        "field_types": {
+            "type": str,
+            "name": str,
+            "start_date": (str, date),
+            "end_date": (str, date, type(None)),
+            "monthly_cost": (int, float),
+            "vendor": (str, type(None)),
+            "license_count": (int, type(None)),
+            "annual_cost": (int, float, type(None)),
+            "tags": list,
+            "notes": (str, type(None))
+        },
+        "field_constraints": {
+            "monthly_cost": {"min": 0},
+            "annual_cost": {"min": 0},
+            "license_count": {"min": 1}
+        }
+    },
+    
+    "equipment": {
+        "required_fields": ["type", "name", "start_date", "cost", "purchase_date"],
+        "optional_fields": ["end_date", "vendor", "category", "depreciation_years", "tags", "notes"],
+        "field_types": {
+            "type": str,
+            "name": str,
+            "start_date": (str, date),
+            "end_date": (str, date, type(None)),
+            "cost": (int, float),
+            "purchase_date": (str, date),
+            "vendor": (str, type(None)),
+            "category": (str, type(None)),
+            "depreciation_years": (int, type(None)),
+            "tags": list,
+            "notes": (str, type(None))
+        },
+        "field_constraints": {
+            "cost": {"min": 0},
+            "depreciation_years": {"min": 1, "max": 50}
+        }
+    },
+    
+    "project": {
+        "required_fields": ["type", "name", "start_date", "total_budget"],
+        "optional_fields": ["end_date", "project_manager", "status", "completion_percentage", "tags", "notes"],
+        "field_types": {
+            "type": str,
+            "name": str,
+            "start_date": (str, date),
+            "end_date": (str, date, type(None)),
+            "total_budget": (int, float),
+            "project_manager": (str, type(None)),
+            "status": (str, type(None)),
+            "completion_percentage": (int, float, type(None)),
+            "tags": list,
+            "notes": (str, type(None))
+        },
+        "field_constraints": {
+            "total_budget": {"min": 0},
+            "completion_percentage": {"min": 0, "max": 100}
+        }
+    }
+})
+
+
 class FileValidator:
     """Validates file content and entity data."""
     
     def __init__(self):
         """Initialize file validator."""
-        self.entity_type_schemas = self._load_entity_schemas()
-    
-    def _load_entity_schemas(self) -> Dict[str, Dict[str, Any]]:
-        """Load entity validation schemas.
-        
-        Returns:
-            Dictionary of entity type to schema mappings
-        """
-        return {
-            "employee": {
-                "required_fields": ["type", "name", "start_date", "salary"],
-                "optional_fields": ["end_date", "position", "department", "overhead_multiplier", "tags", "notes"],
-                "field_types": {
-                    "type": str,
-                    "name": str,
-                    "start_date": (str, date),
-                    "end_date": (str, date, type(None)),
-                    "salary": (int, float),
-                    "position": (str, type(None)),
-                    "department": (str, type(None)),
-                    "overhead_multiplier": (int, float),
-                    "tags": list,
-                    "notes": (str, type(None))
-                },
-                "field_constraints": {
-                    "salary": {"min": 0},
-                    "overhead_multiplier": {"min": 1.0, "max": 3.0}
-                }
-            },
-            
-            "grant": {
-                "required_fields": ["type", "name", "start_date", "amount"],
-                "optional_fields": ["end_date", "agency", "program", "grant_number", "tags", "notes"],
-                "field_types": {
-                    "type": str,
-                    "name": str,
-                    "start_date": (str, date),
-                    "end_date": (str, date, type(None)),
-                    "amount": (int, float),
-                    "agency": (str, type(None)),
-                    "program": (str, type(None)),
-                    "grant_number": (str, type(None)),
-                    "tags": list,
-                    "notes": (str, type(None))
-                },
-                "field_constraints": {
-                    "amount": {"min": 0}
-                }
-            },
-            
-            "investment": {
-                "required_fields": ["type", "name", "start_date", "amount"],
-                "optional_fields": ["end_date", "investor", "round_type", "pre_money_valuation", "tags", "notes"],
-                "field_types": {
-                    "type": str,
-                    "name": str,
-                    "start_date": (str, date),
-                    "end_date": (str, date, type(None)),
-                    "amount": (int, float),
-                    "investor": (str, type(None)),
-                    "round_type": (str, type(None)),
-                    "pre_money_valuation": (int, float, type(None)),
-                    "tags": list,
-                    "notes": (str, type(None))
-                },
-                "field_constraints": {
-                    "amount": {"min": 0},
-                    "pre_money_valuation": {"min": 0}
-                }
-            },
-            
-            "facility": {
-                "required_fields": ["type", "name", "start_date", "monthly_cost"],
-                "optional_fields": ["end_date", "location", "size_sqft", "facility_type", "tags", "notes"],
-                "field_types": {
-                    "type": str,
-                    "name": str,
-                    "start_date": (str, date),
-                    "end_date": (str, date, type(None)),
-                    "monthly_cost": (int, float),
-                    "location": (str, type(None)),
-                    "size_sqft": (int, type(None)),
-                    "facility_type": (str, type(None)),
-                    "tags": list,
-                    "notes": (str, type(None))
-                },
-                "field_constraints": {
-                    "monthly_cost": {"min": 0},
-                    "size_sqft": {"min": 0}
-                }
-            },
-            
-            "software": {
-                "required_fields": ["type", "name", "start_date", "monthly_cost"],
-                "optional_fields": ["end_date", "vendor", "license_count", "annual_cost", "tags", "notes"],
-                "field_types": {
-                    "type": str,
-                    "name": str,
-                    "start_date": (str, date),
-                    "end_date": (str, date, type(None)),
-                    "monthly_cost": (int, float),
-                    "vendor": (str, type(None)),
-                    "license_count": (int, type(None)),
-                    "annual_cost": (int, float, type(None)),
-                    "tags": list,
-                    "notes": (str, type(None))
-                },
-                "field_constraints": {
-                    "monthly_cost": {"min": 0},
-                    "annual_cost": {"min": 0},
-                    "license_count": {"min": 1}
-                }
-            },
-            
-            "equipment": {
-                "required_fields": ["type", "name", "start_date", "cost", "purchase_date"],
-                "optional_fields": ["end_date", "vendor", "category", "depreciation_years", "tags", "notes"],
-                "field_types": {
-                    "type": str,
-                    "name": str,
-                    "start_date": (str, date),
-                    "end_date": (str, date, type(None)),
-                    "cost": (int, float),
-                    "purchase_date": (str, date),
-                    "vendor": (str, type(None)),
-                    "category": (str, type(None)),
-                    "depreciation_years": (int, type(None)),
-                    "tags": list,
-                    "notes": (str, type(None))
-                },
-                "field_constraints": {
-                    "cost": {"min": 0},
-                    "depreciation_years": {"min": 1, "max": 50}
-                }
-            },
-            
-            "project": {
-                "required_fields": ["type", "name", "start_date", "total_budget"],
-                "optional_fields": ["end_date", "project_manager", "status", "completion_percentage", "tags", "notes"],
-                "field_types": {
-                    "type": str,
-                    "name": str,
-                    "start_date": (str, date),
-                    "end_date": (str, date, type(None)),
-                    "total_budget": (int, float),
-                    "project_manager": (str, type(None)),
-                    "status": (str, type(None)),
-                    "completion_percentage": (int, float, type(None)),
-                    "tags": list,
-                    "notes": (str, type(None))
-                },
-                "field_constraints": {
-                    "total_budget": {"min": 0},
-                    "completion_percentage": {"min": 0, "max": 100}
-                }
-            }
-        }
+        self.entity_type_schemas = ENTITY_TYPE_SCHEMAS
     
     def validate_entity_data(self, entity_data: Dict[str, Any]) -> List[str]:
         """Validate entity data against schema.
@@ -600,10 +599,13 @@ class FileValidator:
         
         schema = self.entity_type_schemas[entity_type]
         
+        # Copy the shared schema's lists and constraints so callers can't alter them
         return {
-            "required_fields": schema["required_fields"],
-            "optional_fields": schema["optional_fields"],
+            "required_fields": list(schema["required_fields"]),
+            "optional_fields": list(schema["optional_fields"]),
             "field_types": {k: [t.__name__ for t in (v if isinstance(v, tuple) else (v,))] 
                            for k, v in schema["field_types"].items()},
-            "field_constraints": schema.get("field_constraints", {})
+            "field_constraints": {
+                k: dict(v) for k, v in schema.get("field_constraints", {}).items()
+            }
         }
\ No newline at end of file
@@ -5,7 +5,8 @@ CashCow Web API - Main application entry point.
 import asyncio
 import logging
 
-from fastapi import FastAPI, WebSocket, Request
+import orjson
+from fastapi import FastAPI, WebSocket, Request, Response
 from . import create_app
 from .routers import entities, calculations, scenarios, analysis, reports, files
 from .websockets.handlers import (
@@ -118,19 +119,44 @@ async def websocket_status_endpoint(websocket: WebSocket, request: Request):
     await websocket_status(websocket, request)
 
 
+# Constant response bodies, encoded once instead of on every request
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": "cashcow-api",
+    "version": "0.1.0"
+})
+
+_ROOT_BYTES = orjson.dumps({
+    "message": "CashCow API",
+    "version": "0.1.0",
+    "docs": "/docs",
+    "health": "/health",
+    "api_endpoints": {
+        "entities": "/entities",
+        "calculations": "/calculations", 
+        "scenarios": "/scenarios",
+        "analysis": "/analysis",
+        "reports": "/reports",
+        "files": "/files"
+    },
+    "websockets": {
+        "calculations": "/ws/calculations",
+        "entities": "/ws/entities", 
+        "status": "/ws/status"
+    },
+    "jobs_api": "/api/jobs"
+})
+
+
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint for monitoring and load balancers.
     
     Returns:
-        dict: Health status information
+        Response: Pre-encoded health status information
     """
-    return {
-        "status": "healthy",
-        "service": "cashcow-api",
-        "version": "0.1.0"
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 
 @app.get("/")
@@ -139,28 +165,9 @@ async def root():
     Root endpoint with basic API information.
     
     Returns:
-        dict: API information
+        Response: Pre-encoded API information
     """
-    return {
-        "message": "CashCow API",
-        "version": "0.1.0",
-        "docs": "/docs",
-        "health": "/health",
-        "api_endpoints": {
-            "entities": "/entities",
-            "calculations": "/calculations", 
-            "scenarios": "/scenarios",
-            "analysis": "/analysis",
-            "reports": "/reports",
-            "files": "/files"
-        },
-        "websockets": {
-            "calculations": "/ws/calculations",
-            "entities": "/ws/entities", 
-            "status": "/ws/status"
-        },
-        "jobs_api": "/api/jobs"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 # Job management endpoints
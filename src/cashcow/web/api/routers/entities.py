@@ -4,19 +4,21 @@ Mock implementation for development.
 """
 
 import uuid
-import os
-from datetime import date
-from pathlib import Path
-from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import JSONResponse
-import yaml
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
+import orjson
+
+from ..files.validators import FileValidator
 
 # Create router
 router = APIRouter(prefix="/entities", tags=["entities"])
 
+# Shared validator; its schemas are built once rather than per request
+_validator = FileValidator()
+
 # Mock entity data for development
-MOCK_ENTITIES = [
+_SEED_ENTITIES = [
     {
         "id": "emp1",
         "type": "employee",
@@ -104,10 +106,111 @@ MOCK_ENTITIES = [
     }
 ]
 
+# Entity store keyed by ID so lookups don't scan every entity
+MOCK_ENTITIES: Dict[str, Dict[str, Any]] = {
+    entity["id"]: entity for entity in _SEED_ENTITIES
+}
+
+# Entity type catalogue served by /types/available
+ENTITY_TYPES = [
+    {
+        "type": "employee",
+        "display_name": "Employee",
+        "description": "Company employees and contractors",
+        "required_fields": ["name", "start_date", "salary"],
+        "optional_fields": ["position", "department", "equity_eligible"],
+        "example": {
+            "type": "employee",
+            "name": "John Doe",
+            "start_date": "2024-01-01", 
+            "salary": 75000,
+            "position": "Software Engineer"
+        }
+    },
+    {
+        "type": "grant",
+        "display_name": "Grant",
+        "description": "Government and institutional grants",
+        "required_fields": ["name", "start_date", "amount"],
+        "optional_fields": ["agency", "program", "indirect_cost_rate"],
+        "example": {
+            "type": "grant",
+            "name": "SBIR Phase I",
+            "start_date": "2024-01-01",
+            "amount": 100000,
+            "agency": "NASA"
+        }
+    },
+    {
+        "type": "project",
+        "display_name": "Project", 
+        "description": "Development projects and initiatives",
+        "required_fields": ["name", "start_date", "total_budget"],
+        "optional_fields": ["status", "priority", "completion_percentage"],
+        "example": {
+            "type": "project",
+            "name": "New Product Development",
+            "start_date": "2024-01-01",
+            "total_budget": 50000,
+            "status": "planned"
+        }
+    },
+    {
+        "type": "facility",
+        "display_name": "Facility",
+        "description": "Office spaces and facilities",
+        "required_fields": ["name", "start_date", "monthly_cost"],
+        "optional_fields": ["location", "size_sqft", "facility_type"],
+        "example": {
+            "type": "facility",
+            "name": "Main Office",
+            "start_date": "2024-01-01",
+            "monthly_cost": 5000,
+            "location": "San Francisco, CA"
+        }
+    }
+]
+
+# The catalogue is static, so its response body is encoded once
+_ENTITY_TYPES_BYTES = orjson.dumps({
+    "success": True,
+    "data": ENTITY_TYPES
+})
+
+# Encoded GET responses keyed by entity ID, evicted whenever that entity changes
+_entity_response_cache: Dict[str, bytes] = {}
+_ENTITY_RESPONSE_CACHE_SIZE = 1024
+
+
+def clear_entity_cache() -> None:
+    """Clear the encoded entity response cache."""
+    _entity_response_cache.clear()
+
+
 def get_current_user():
     """Mock user for development."""
     return {"user_id": "dev-user", "username": "developer"}
 
+
+async def _stream_entity_list(
+    entity_chunks: List[bytes],
+    pagination_bytes: bytes
+) -> AsyncIterator[bytes]:
+    """
+    Frame pre-encoded entities as a list response, one entity per chunk.
+    
+    Produces the same JSON document as the non-streaming response:
+    ``{"success": true, "data": [...], "total": ..., ...}``.
+    """
+    yield b'{"success":true,"data":['
+    for index, chunk in enumerate(entity_chunks):
+        if index:
+            yield b","
+        yield chunk
+    # Splice the pagination fields into the enclosing object
+    yield b"]," + pagination_bytes[1:]
+
+
 @router.get("/")
 async def list_entities(
     page: int = Query(1, ge=1, description="Page number"),
@@ -122,7 +225,7 @@ async def list_entities(
     """
     try:
         # Start with all entities
-        entities = MOCK_ENTITIES.copy()
+        entities = list(MOCK_ENTITIES.values())
         
         # Apply filters
         if type:
@@ -141,15 +244,22 @@ async def list_entities(
         end_idx = start_idx + per_page
         paginated_entities = entities[start_idx:end_idx]
         
-        return {
-            "success": True,
-            "data": paginated_entities,
+        pagination = {
             "total": total,
             "page": page,
             "per_page": per_page,
             "total_pages": (total + per_page - 1) // per_page
         }
         
+        # Encode before streaming starts; once the 200 headers are sent, an
+        # encoding error could only truncate the body rather than become a 500
+        entity_chunks = [orjson.dumps(entity) for entity in paginated_entities]
+        
+        return StreamingResponse(
+            _stream_entity_list(entity_chunks, orjson.dumps(pagination)),
+            media_type="application/json"
+        )
+        
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -157,6 +267,17 @@ async def list_entities(
         )
 
 
+@router.get("/exists")
+async def entities_exist(
+    ids: str = Query(..., description="Comma-separated entity IDs"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Check which of the given entity IDs exist.
+    """
+    return {entity_id: entity_id in MOCK_ENTITIES for entity_id in ids.split(",") if entity_id}
+
+
 @router.get("/{entity_id}")
 async def get_entity(
     entity_id: str,
@@ -165,17 +286,27 @@ async def get_entity(
     """
     Get a specific entity by ID.
     """
-    entity = next((e for e in MOCK_ENTITIES if e["id"] == entity_id), None)
-    if not entity:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Entity with ID {entity_id} not found"
-        )
+    # Check cache first
+    content = _entity_response_cache.get(entity_id)
+    if content is None:
+        entity = MOCK_ENTITIES.get(entity_id)
+        if not entity:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Entity with ID {entity_id} not found"
+            )
+        
+        content = orjson.dumps({
+            "success": True,
+            "data": entity
+        })
+        
+        # Drop the oldest entry once the cache is full
+        if len(_entity_response_cache) >= _ENTITY_RESPONSE_CACHE_SIZE:
+            del _entity_response_cache[next(iter(_entity_response_cache))]
+        _entity_response_cache[entity_id] = content
     
-    return {
-        "success": True,
-        "data": entity
-    }
+    return Response(content=content, media_type="application/json")
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
@@ -187,8 +318,11 @@ async def create_entity(
     Create a new entity.
     """
     try:
-        # Generate new ID
+        # Generate new ID, retrying on a short-ID collision so an existing
+        # entity is never overwritten
         entity_id = str(uuid.uuid4())[:8]
+        while entity_id in MOCK_ENTITIES:
+            entity_id = str(uuid.uuid4())[:8]
         
         # Create new entity
         new_entity = {
@@ -198,7 +332,8 @@ async def create_entity(
         }
         
         # Add to mock data (in a real implementation, this would save to database)
-        MOCK_ENTITIES.append(new_entity)
+        MOCK_ENTITIES[entity_id] = new_entity
+        _entity_response_cache.pop(entity_id, None)
         
         return {
             "success": True,
@@ -213,6 +348,26 @@ async def create_entity(
         )
 
 
+@router.post("/validate")
+async def validate_entity(
+    entity: dict = Body(..., embed=True),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Validate entity data without saving it.
+    """
+    errors = _validator.validate_entity_data(entity)
+    
+    return {
+        "success": True,
+        "validation": {
+            "valid": not errors,
+            "errors": errors,
+            "warnings": []
+        }
+    }
+
+
 @router.put("/{entity_id}")
 async def update_entity(
     entity_id: str,
@@ -223,8 +378,8 @@ async def update_entity(
     Update an existing entity.
     """
     # Find entity
-    entity_index = next((i for i, e in enumerate(MOCK_ENTITIES) if e["id"] == entity_id), None)
-    if entity_index is None:
+    entity = MOCK_ENTITIES.get(entity_id)
+    if entity is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Entity with ID {entity_id} not found"
@@ -232,11 +387,12 @@ async def update_entity(
     
     try:
         # Update entity
-        MOCK_ENTITIES[entity_index].update(update_data)
+        entity.update(update_data)
+        _entity_response_cache.pop(entity_id, None)
         
         return {
             "success": True,
-            "data": MOCK_ENTITIES[entity_index],
+            "data": entity,
             "message": "Entity updated successfully"
         }
         
@@ -256,8 +412,7 @@ async def delete_entity(
     Delete an entity.
     """
     # Find entity
-    entity_index = next((i for i, e in enumerate(MOCK_ENTITIES) if e["id"] == entity_id), None)
-    if entity_index is None:
+    if entity_id not in MOCK_ENTITIES:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Entity with ID {entity_id} not found"
@@ -265,7 +420,8 @@ async def delete_entity(
     
     try:
         # Remove entity
-        MOCK_ENTITIES.pop(entity_index)
+        del MOCK_ENTITIES[entity_id]
+        _entity_response_cache.pop(entity_id, None)
         
     except Exception as e:
         raise HTTPException(
@@ -274,73 +430,31 @@ async def delete_entity(
         )
 
 
-@router.get("/types/available")
-async def get_entity_types(
+@router.post("/bulk-delete")
+async def bulk_delete_entities(
+    ids: List[str] = Body(..., embed=True),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Get information about available entity types.
+    Delete several entities in one request.
+    
+    Unknown IDs are ignored; the response reports how many were removed.
     """
-    entity_types = [
-        {
-            "type": "employee",
-            "display_name": "Employee",
-            "description": "Company employees and contractors",
-            "required_fields": ["name", "start_date", "salary"],
-            "optional_fields": ["position", "department", "equity_eligible"],
-            "example": {
-                "type": "employee",
-                "name": "John Doe",
-                "start_date": "2024-01-01", 
-                "salary": 75000,
-                "position": "Software Engineer"
-            }
-        },
-        {
-            "type": "grant",
-            "display_name": "Grant",
-            "description": "Government and institutional grants",
-            "required_fields": ["name", "start_date", "amount"],
-            "optional_fields": ["agency", "program", "indirect_cost_rate"],
-            "example": {
-                "type": "grant",
-                "name": "SBIR Phase I",
-                "start_date": "2024-01-01",
-                "amount": 100000,
-                "agency": "NASA"
-            }
-        },
-        {
-            "type": "project",
-            "display_name": "Project", 
-            "description": "Development projects and initiatives",
-            "required_fields": ["name", "start_date", "total_budget"],
-            "optional_fields": ["status", "priority", "completion_percentage"],
-            "example": {
-                "type": "project",
-                "name": "New Product Development",
-                "start_date": "2024-01-01",
-                "total_budget": 50000,
-                "status": "planned"
-            }
-        },
-        {
-            "type": "facility",
-            "display_name": "Facility",
-            "description": "Office spaces and facilities",
-            "required_fields": ["name", "start_date", "monthly_cost"],
-            "optional_fields": ["location", "size_sqft", "facility_type"],
-            "example": {
-                "type": "facility",
-                "name": "Main Office",
-                "start_date": "2024-01-01",
-                "monthly_cost": 5000,
-                "location": "San Francisco, CA"
-            }
-        }
-    ]
+    deleted = [entity_id for entity_id in ids if MOCK_ENTITIES.pop(entity_id, None) is not None]
+    for entity_id in deleted:
+        _entity_response_cache.pop(entity_id, None)
     
     return {
         "success": True,
-        "data": entity_types
-    }
\ No newline at end of file
+        "deleted": len(deleted)
+    }
+
+
+@router.get("/types/available")
+async def get_entity_types(
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get information about available entity types.
+    """
+    return Response(content=_ENTITY_TYPES_BYTES, media_type="application/json")
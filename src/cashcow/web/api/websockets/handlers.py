@@ -5,7 +5,7 @@ WebSocket endpoint handlers for real-time CashCow updates.
 import asyncio
 import json
 import logging
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import WebSocket, WebSocketDisconnect, Request
 
@@ -15,6 +15,57 @@ from .manager import connection_manager, WebSocketMessage
 logger = logging.getLogger(__name__)
 
 
+async def _receive_messages(websocket: WebSocket) -> List[dict]:
+    """
+    Receive JSON messages from either a text or a binary frame.
+    
+    A frame holds either one JSON document or several newline-delimited
+    ones, letting clients batch messages into a single frame. A batch is
+    accepted or rejected as a whole, so no part of a bad batch is handled.
+    
+    Args:
+        websocket: WebSocket connection
+        
+    Returns:
+        Parsed message dictionaries, in the order they were sent
+        
+    Raises:
+        WebSocketDisconnect: If the client disconnected
+        ValueError: If the frame is not UTF-8 encoded JSON, or a message in
+            it is not a JSON object
+    """
+    frame = await websocket.receive()
+    if frame["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(frame.get("code", 1000))
+    
+    data = frame.get("text")
+    if data is None:
+        try:
+            data = frame["bytes"].decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Binary frame is not valid UTF-8: {e}") from None
+    
+    try:
+        messages = [json.loads(data)]
+    except json.JSONDecodeError as error:
+        # Not a single document; fall back to newline-delimited JSON
+        lines = [line for line in data.splitlines() if line.strip()]
+        if len(lines) < 2:
+            raise
+        try:
+            messages = [json.loads(line) for line in lines]
+        except json.JSONDecodeError:
+            # Not a batch either, so report the frame as a whole
+            raise error from None
+    
+    for message in messages:
+        if not isinstance(message, dict):
+            raise ValueError(
+                f"WebSocket messages must be JSON objects, got {type(message).__name__}"
+            )
+    return messages
+
+
 async def websocket_calculations(websocket: WebSocket, request: Request):
     """
     WebSocket endpoint for real-time calculation progress updates.
@@ -50,14 +101,13 @@ async def websocket_calculations(websocket: WebSocket, request: Request):
         # Listen for incoming messages
         while True:
             try:
-                data = await websocket.receive_text()
-                message = json.loads(data)
-                await connection_manager.handle_message(connection_id, message)
+                for message in await _receive_messages(websocket):
+                    await connection_manager.handle_message(connection_id, message)
                 
             except WebSocketDisconnect:
                 break
-            except json.JSONDecodeError as e:
-                logger.warning(f"Invalid JSON from {connection_id}: {e}")
+            except ValueError as e:
+                logger.warning(f"Invalid message from {connection_id}: {e}")
             except Exception as e:
                 logger.error(f"Error handling message from {connection_id}: {e}")
                 
@@ -103,14 +153,13 @@ async def websocket_entities(websocket: WebSocket, request: Request):
         # Listen for incoming messages
         while True:
             try:
-                data = await websocket.receive_text()
-                message = json.loads(data)
-                await connection_manager.handle_message(connection_id, message)
+                for message in await _receive_messages(websocket):
+                    await connection_manager.handle_message(connection_id, message)
                 
             except WebSocketDisconnect:
                 break
-            except json.JSONDecodeError as e:
-                logger.warning(f"Invalid JSON from {connection_id}: {e}")
+            except ValueError as e:
+                logger.warning(f"Invalid message from {connection_id}: {e}")
             except Exception as e:
                 logger.error(f"Error handling message from {connection_id}: {e}")
                 
@@ -161,14 +210,13 @@ async def websocket_status(websocket: WebSocket, request: Request):
         # Listen for incoming messages
         while True:
             try:
-                data = await websocket.receive_text()
-                message = json.loads(data)
-                await connection_manager.handle_message(connection_id, message)
+                for message in await _receive_messages(websocket):
+                    await connection_manager.handle_message(connection_id, message)
                 
             except WebSocketDisconnect:
                 break
-            except json.JSONDecodeError as e:
-                logger.warning(f"Invalid JSON from {connection_id}: {e}")
+            except ValueError as e:
+                logger.warning(f"Invalid message from {connection_id}: {e}")
             except Exception as e:
                 logger.error(f"Error handling message from {connection_id}: {e}")
                 
@@ -9,6 +9,17 @@ from typing import Generator, List
 import pytest
 
 
+def pytest_collection_modifyitems(config, items):
+    """Skip slow benchmarks unless they are selected with ``-m slow``."""
+    if "slow" in (config.getoption("markexpr") or ""):
+        return
+
+    skip_slow = pytest.mark.skip(reason="slow benchmark; run with -m slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
 @pytest.fixture(scope="function")
 def event_loop_policy() -> Generator[asyncio.AbstractEventLoopPolicy, None, None]:
     """Create and provide a fresh event loop policy for each test function.
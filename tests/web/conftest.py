@@ -3,15 +3,19 @@ Test configuration for CashCow Web API tests.
 """
 
 import asyncio
+import copy
 import os
 import tempfile
 from pathlib import Path
+from types import MappingProxyType
 from typing import AsyncGenerator, Generator
 
+import orjson
 import pytest
 import pytest_asyncio
+from asgi_lifespan import LifespanManager
 from fastapi.testclient import TestClient
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 
 # Import the web application
 from cashcow.web.api import create_app
@@ -19,11 +23,24 @@ from cashcow.web.api.main import app as main_app
 from cashcow.storage.yaml_loader import YamlEntityLoader
 from cashcow.models import create_entity
 
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
+
 
 @pytest.fixture(scope="session")
-def event_loop() -> Generator:
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Run async web tests on uvloop where it is available."""
+    if uvloop is None:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
+def event_loop(event_loop_policy: asyncio.AbstractEventLoopPolicy) -> Generator:
+    """Create an instance of the event loop for the test session."""
+    loop = event_loop_policy.new_event_loop()
     yield loop
     loop.close()
 
@@ -94,7 +111,7 @@ def sample_entities(temp_entities_dir: Path) -> dict:
     return entities
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_app():
     """Create a test FastAPI application."""
     # Set test environment variables
@@ -106,18 +123,62 @@ def test_app():
     return app
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_client(test_app) -> Generator[TestClient, None, None]:
-    """Create a test client for the FastAPI application."""
+    """Create a test client shared by the whole test session."""
     with TestClient(test_app) as client:
         yield client
 
 
-@pytest_asyncio.fixture
+def recv_json(websocket) -> dict:
+    """Receive one WebSocket text frame and decode it with orjson."""
+    return orjson.loads(websocket.receive_text())
+
+
+def _connect_websocket(test_client: TestClient, path: str) -> Generator:
+    """Open a WebSocket, check and drain its welcome message, and yield it."""
+    with test_client.websocket_connect(path) as websocket:
+        assert recv_json(websocket)["type"] == "connected"
+        yield websocket
+
+
+@pytest.fixture
+def ws_status(test_client: TestClient) -> Generator:
+    """Status updates WebSocket with its welcome message already drained."""
+    yield from _connect_websocket(test_client, "/ws/status")
+
+
+@pytest.fixture
+def ws_entities(test_client: TestClient) -> Generator:
+    """Entity updates WebSocket with its welcome message already drained."""
+    yield from _connect_websocket(test_client, "/ws/entities")
+
+
+@pytest.fixture
+def ws_calculations(test_client: TestClient) -> Generator:
+    """Calculation updates WebSocket with its welcome message already drained."""
+    yield from _connect_websocket(test_client, "/ws/calculations")
+
+
+@pytest.fixture
+def entities_rollback() -> Generator[None, None, None]:
+    """Restore the in-memory entity store after a test mutates it."""
+    from cashcow.web.api.routers.entities import MOCK_ENTITIES, clear_entity_cache
+
+    snapshot = copy.deepcopy(MOCK_ENTITIES)
+    yield
+    MOCK_ENTITIES.clear()
+    MOCK_ENTITIES.update(snapshot)
+    clear_entity_cache()
+
+
+@pytest_asyncio.fixture(scope="session")
 async def async_test_client(test_app) -> AsyncGenerator[AsyncClient, None]:
-    """Create an async test client for the FastAPI application."""
-    async with AsyncClient(app=test_app, base_url="http://test") as client:
-        yield client
+    """Create an async test client shared by the whole test session."""
+    async with LifespanManager(test_app) as manager:
+        transport = ASGITransport(app=manager.app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
 
 
 @pytest.fixture
@@ -146,37 +207,61 @@ def mock_user() -> dict:
     }
 
 
+# Read-only test data templates; fixtures hand out plain dict copies, which
+# tests can tweak and httpx can serialise. Nested values are tuples so the
+# shallow copies can't mutate the templates; they still encode as JSON arrays
+SAMPLE_GRANT = MappingProxyType({
+    "type": "grant",
+    "name": "Test Grant API",
+    "start_date": "2024-01-01",
+    "amount": 750000,
+    "agency": "NASA",
+    "program": "SBIR",
+    "grant_number": "TEST123",
+    "indirect_cost_rate": 0.25,
+    "tags": ("api-test", "grant")
+})
+
+SAMPLE_EMPLOYEE = MappingProxyType({
+    "type": "employee",
+    "name": "Test Employee API",
+    "start_date": "2024-01-01",
+    "salary": 120000,
+    "position": "Senior Engineer",
+    "department": "Engineering",
+    "overhead_multiplier": 1.4,
+    "equity_eligible": True,
+    "tags": ("api-test", "employee")
+})
+
+
 # Test data fixtures
 @pytest.fixture
 def sample_grant_data() -> dict:
     """Sample grant entity data for testing."""
-    return {
-        "type": "grant",
-        "name": "Test Grant API",
-        "start_date": "2024-01-01",
-        "amount": 750000,
-        "agency": "NASA",
-        "program": "SBIR",
-        "grant_number": "TEST123",
-        "indirect_cost_rate": 0.25,
-        "tags": ["api-test", "grant"]
-    }
+    return dict(SAMPLE_GRANT)
 
 
 @pytest.fixture
 def sample_employee_data() -> dict:
     """Sample employee entity data for testing."""
-    return {
-        "type": "employee",
-        "name": "Test Employee API",
-        "start_date": "2024-01-01",
-        "salary": 120000,
-        "position": "Senior Engineer",
-        "department": "Engineering",
-        "overhead_multiplier": 1.4,
-        "equity_eligible": True,
-        "tags": ["api-test", "employee"]
-    }
+    return dict(SAMPLE_EMPLOYEE)
+
+
+@pytest.fixture(scope="session")
+def seeded_entities(test_client: TestClient) -> Generator[dict, None, None]:
+    """Create the sample grant and employee once for tests that only read them."""
+    seeded = {}
+    try:
+        for key, template in (("grant_id", SAMPLE_GRANT), ("employee_id", SAMPLE_EMPLOYEE)):
+            response = test_client.post("/api/entities/", json=dict(template))
+            assert response.status_code == 201
+            seeded[key] = response.json()["data"]["id"]
+        
+        yield seeded
+    finally:
+        # Also removes whatever was created before a failed POST
+        test_client.post("/api/entities/bulk-delete", json={"ids": list(seeded.values())})
 
 
 @pytest.fixture
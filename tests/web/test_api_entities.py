@@ -2,148 +2,142 @@
 Tests for entity management API endpoints.
 """
 
+import time
+
 import pytest
-from fastapi.testclient import TestClient
 from httpx import AsyncClient
 
 
+# Every test here shares the session client, so undo entity changes per test
+pytestmark = pytest.mark.usefixtures("entities_rollback")
+
+
+# Performance budgets in nanoseconds, keyed by scenario
+PERF_BUDGETS = {
+    "list_100": 2_000_000_000,
+    "bulk_delete_10": 5_000_000_000,
+}
+
+
+@pytest.mark.asyncio
 class TestEntityEndpoints:
     """Test cases for entity CRUD operations."""
 
-    def test_health_check(self, test_client: TestClient):
+    async def test_health_check(self, async_test_client: AsyncClient):
         """Test the health check endpoint."""
-        response = test_client.get("/health")
+        response = await async_test_client.get("/health")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
         assert data["service"] == "cashcow-api"
 
-    def test_api_root(self, test_client: TestClient):
+    async def test_api_root(self, async_test_client: AsyncClient):
         """Test the API root endpoint."""
-        response = test_client.get("/")
+        response = await async_test_client.get("/")
         assert response.status_code == 200
         data = response.json()
         assert data["message"] == "CashCow API"
         assert "api_endpoints" in data
         assert "websockets" in data
 
-    def test_list_entities_empty(self, test_client: TestClient):
+    async def test_list_entities_empty(self, async_test_client: AsyncClient):
         """Test listing entities when none exist."""
-        response = test_client.get("/api/entities/")
+        response = await async_test_client.get("/api/entities/")
         assert response.status_code == 200
         data = response.json()
         assert "entities" in data
         assert isinstance(data["entities"], list)
         assert data["total"] >= 0
 
-    def test_create_grant_entity(self, test_client: TestClient, sample_grant_data: dict):
-        """Test creating a grant entity."""
-        response = test_client.post(
+    @pytest.mark.parametrize(
+        "entity_fixture, key_field, update_fields",
+        [
+            pytest.param(
+                "sample_grant_data", "amount",
+                {"name": "Updated Grant Name", "amount": 600000},
+                id="grant"
+            ),
+            pytest.param(
+                "sample_employee_data", "salary",
+                {"name": "Updated Employee Name", "salary": 130000},
+                id="employee"
+            ),
+        ]
+    )
+    async def test_entity_crud(
+        self,
+        request: pytest.FixtureRequest,
+        async_test_client: AsyncClient,
+        entity_fixture: str,
+        key_field: str,
+        update_fields: dict
+    ):
+        """Test creating, retrieving, updating and deleting an entity."""
+        entity_data = request.getfixturevalue(entity_fixture)
+
+        # Create entity
+        create_response = await async_test_client.post(
             "/api/entities/",
-            json={"entity": sample_grant_data}
+            json={"entity": entity_data}
         )
-        assert response.status_code == 201
-        data = response.json()
+        assert create_response.status_code == 201
+        data = create_response.json()
         assert data["success"] is True
         assert "entity" in data
         
         entity = data["entity"]
-        assert entity["type"] == "grant"
-        assert entity["name"] == sample_grant_data["name"]
-        assert entity["amount"] == sample_grant_data["amount"]
+        assert entity["type"] == entity_data["type"]
+        assert entity["name"] == entity_data["name"]
+        assert entity[key_field] == entity_data[key_field]
         assert "id" in entity
+        entity_id = entity["id"]
 
-    def test_create_employee_entity(self, test_client: TestClient, sample_employee_data: dict):
-        """Test creating an employee entity."""
-        response = test_client.post(
-            "/api/entities/",
-            json={"entity": sample_employee_data}
-        )
-        assert response.status_code == 201
-        data = response.json()
-        assert data["success"] is True
-        
-        entity = data["entity"]
-        assert entity["type"] == "employee"
-        assert entity["name"] == sample_employee_data["name"]
-        assert entity["salary"] == sample_employee_data["salary"]
-
-    def test_get_entity_by_id(self, test_client: TestClient, sample_grant_data: dict):
-        """Test retrieving a specific entity by ID."""
-        # First create an entity
-        create_response = test_client.post(
-            "/api/entities/",
-            json={"entity": sample_grant_data}
-        )
-        assert create_response.status_code == 201
-        created_entity = create_response.json()["entity"]
-        entity_id = created_entity["id"]
-
-        # Then retrieve it
-        get_response = test_client.get(f"/api/entities/{entity_id}")
+        # Retrieve it
+        get_response = await async_test_client.get(f"/api/entities/{entity_id}")
         assert get_response.status_code == 200
         data = get_response.json()
         assert data["success"] is True
         
         entity = data["entity"]
         assert entity["id"] == entity_id
-        assert entity["name"] == sample_grant_data["name"]
-
-    def test_update_entity(self, test_client: TestClient, sample_grant_data: dict):
-        """Test updating an existing entity."""
-        # Create entity
-        create_response = test_client.post(
-            "/api/entities/",
-            json={"entity": sample_grant_data}
-        )
-        entity_id = create_response.json()["entity"]["id"]
+        assert entity["name"] == entity_data["name"]
 
-        # Update entity
-        updated_data = {"name": "Updated Grant Name", "amount": 600000}
-        update_response = test_client.put(
+        # Update it
+        update_response = await async_test_client.put(
             f"/api/entities/{entity_id}",
-            json={"entity": updated_data}
+            json={"entity": update_fields}
         )
         assert update_response.status_code == 200
         
         updated_entity = update_response.json()["entity"]
-        assert updated_entity["name"] == "Updated Grant Name"
-        assert updated_entity["amount"] == 600000
+        for field, value in update_fields.items():
+            assert updated_entity[field] == value
 
-    def test_delete_entity(self, test_client: TestClient, sample_grant_data: dict):
-        """Test deleting an entity."""
-        # Create entity
-        create_response = test_client.post(
-            "/api/entities/",
-            json={"entity": sample_grant_data}
-        )
-        entity_id = create_response.json()["entity"]["id"]
-
-        # Delete entity
-        delete_response = test_client.delete(f"/api/entities/{entity_id}")
+        # Delete it
+        delete_response = await async_test_client.delete(f"/api/entities/{entity_id}")
         assert delete_response.status_code == 200
         
         # Verify it's deleted
-        get_response = test_client.get(f"/api/entities/{entity_id}")
+        get_response = await async_test_client.get(f"/api/entities/{entity_id}")
         assert get_response.status_code == 404
 
-    def test_list_entities_with_filters(self, test_client: TestClient, sample_grant_data: dict, sample_employee_data: dict):
+    async def test_list_entities_with_filters(self, async_test_client: AsyncClient, sample_grant_data: dict, sample_employee_data: dict):
         """Test listing entities with type filter."""
         # Create different types of entities
-        test_client.post("/api/entities/", json={"entity": sample_grant_data})
-        test_client.post("/api/entities/", json={"entity": sample_employee_data})
+        await async_test_client.post("/api/entities/", json={"entity": sample_grant_data})
+        await async_test_client.post("/api/entities/", json={"entity": sample_employee_data})
 
         # Filter by type
-        response = test_client.get("/api/entities/?entity_type=grant")
+        response = await async_test_client.get("/api/entities/?entity_type=grant")
         assert response.status_code == 200
         data = response.json()
         
         for entity in data["entities"]:
             assert entity["type"] == "grant"
 
-    def test_list_entities_pagination(self, test_client: TestClient):
+    async def test_list_entities_pagination(self, async_test_client: AsyncClient):
         """Test entity listing with pagination."""
-        response = test_client.get("/api/entities/?page=1&page_size=5")
+        response = await async_test_client.get("/api/entities/?page=1&page_size=5")
         assert response.status_code == 200
         data = response.json()
         
@@ -154,9 +148,9 @@ class TestEntityEndpoints:
         assert data["page"] == 1
         assert data["per_page"] == 5
 
-    def test_validate_entity(self, test_client: TestClient, sample_grant_data: dict):
+    async def test_validate_entity(self, async_test_client: AsyncClient, sample_grant_data: dict):
         """Test entity validation endpoint."""
-        response = test_client.post(
+        response = await async_test_client.post(
             "/api/entities/validate",
             json={"entity": sample_grant_data}
         )
@@ -166,7 +160,7 @@ class TestEntityEndpoints:
         assert "validation" in data
         assert data["validation"]["valid"] is True
 
-    def test_validate_invalid_entity(self, test_client: TestClient):
+    async def test_validate_invalid_entity(self, async_test_client: AsyncClient):
         """Test validation of invalid entity data."""
         invalid_data = {
             "type": "grant",
@@ -175,7 +169,7 @@ class TestEntityEndpoints:
             "amount": -1000  # Invalid: negative amount
         }
         
-        response = test_client.post(
+        response = await async_test_client.post(
             "/api/entities/validate",
             json={"entity": invalid_data}
         )
@@ -186,29 +180,29 @@ class TestEntityEndpoints:
         assert validation["valid"] is False
         assert len(validation["errors"]) > 0
 
-    def test_bulk_delete_entities(self, test_client: TestClient, sample_grant_data: dict, sample_employee_data: dict):
+    async def test_bulk_delete_entities(self, async_test_client: AsyncClient, sample_grant_data: dict, sample_employee_data: dict):
         """Test bulk deletion of entities."""
         # Create multiple entities
-        grant_response = test_client.post("/api/entities/", json={"entity": sample_grant_data})
-        employee_response = test_client.post("/api/entities/", json={"entity": sample_employee_data})
+        grant_response = await async_test_client.post("/api/entities/", json={"entity": sample_grant_data})
+        employee_response = await async_test_client.post("/api/entities/", json={"entity": sample_employee_data})
         
         grant_id = grant_response.json()["entity"]["id"]
         employee_id = employee_response.json()["entity"]["id"]
 
         # Bulk delete
-        response = test_client.post(
+        response = await async_test_client.post(
             "/api/entities/bulk-delete",
             json={"ids": [grant_id, employee_id]}
         )
         assert response.status_code == 200
         
         # Verify entities are deleted
-        assert test_client.get(f"/api/entities/{grant_id}").status_code == 404
-        assert test_client.get(f"/api/entities/{employee_id}").status_code == 404
+        response = await async_test_client.get(f"/api/entities/exists?ids={grant_id},{employee_id}")
+        assert response.json() == {grant_id: False, employee_id: False}
 
-    def test_entity_types_endpoint(self, test_client: TestClient):
+    async def test_entity_types_endpoint(self, async_test_client: AsyncClient):
         """Test the entity types information endpoint."""
-        response = test_client.get("/api/entities/types")
+        response = await async_test_client.get("/api/entities/types")
         assert response.status_code == 200
         data = response.json()
         
@@ -222,17 +216,19 @@ class TestEntityEndpoints:
         assert "category" in entity_type
         assert "required_fields" in entity_type
 
-    def test_search_entities(self, test_client: TestClient, sample_grant_data: dict):
+    async def test_search_entities(self, async_test_client: AsyncClient, sample_grant_data: dict):
         """Test entity search functionality."""
         # Create entity with searchable content
-        searchable_data = sample_grant_data.copy()
-        searchable_data["name"] = "Searchable NASA Grant"
-        searchable_data["notes"] = "This is a test grant for searching"
+        searchable_data = dict(
+            sample_grant_data,
+            name="Searchable NASA Grant",
+            notes="This is a test grant for searching"
+        )
         
-        test_client.post("/api/entities/", json={"entity": searchable_data})
+        await async_test_client.post("/api/entities/", json={"entity": searchable_data})
 
         # Search by name
-        response = test_client.post(
+        response = await async_test_client.post(
             "/api/entities/search",
             json={"query": "Searchable", "fields": ["name", "notes"]}
         )
@@ -243,13 +239,13 @@ class TestEntityEndpoints:
         found_entities = [e for e in data["entities"] if "Searchable" in e["name"]]
         assert len(found_entities) > 0
 
-    def test_entity_statistics(self, test_client: TestClient, sample_grant_data: dict, sample_employee_data: dict):
+    async def test_entity_statistics(self, async_test_client: AsyncClient, sample_grant_data: dict, sample_employee_data: dict):
         """Test entity statistics endpoint."""
         # Create some entities
-        test_client.post("/api/entities/", json={"entity": sample_grant_data})
-        test_client.post("/api/entities/", json={"entity": sample_employee_data})
+        await async_test_client.post("/api/entities/", json={"entity": sample_grant_data})
+        await async_test_client.post("/api/entities/", json={"entity": sample_employee_data})
 
-        response = test_client.get("/api/entities/statistics")
+        response = await async_test_client.get("/api/entities/statistics")
         assert response.status_code == 200
         data = response.json()
         
@@ -260,41 +256,42 @@ class TestEntityEndpoints:
         assert isinstance(data["by_type"], dict)
 
 
+@pytest.mark.asyncio
 class TestEntityErrorHandling:
     """Test error handling in entity endpoints."""
 
-    def test_get_nonexistent_entity(self, test_client: TestClient):
+    async def test_get_nonexistent_entity(self, async_test_client: AsyncClient):
         """Test getting an entity that doesn't exist."""
-        response = test_client.get("/api/entities/nonexistent-id")
+        response = await async_test_client.get("/api/entities/nonexistent-id")
         assert response.status_code == 404
 
-    def test_update_nonexistent_entity(self, test_client: TestClient):
+    async def test_update_nonexistent_entity(self, async_test_client: AsyncClient):
         """Test updating an entity that doesn't exist."""
-        response = test_client.put(
+        response = await async_test_client.put(
             "/api/entities/nonexistent-id",
             json={"entity": {"name": "Updated"}}
         )
         assert response.status_code == 404
 
-    def test_delete_nonexistent_entity(self, test_client: TestClient):
+    async def test_delete_nonexistent_entity(self, async_test_client: AsyncClient):
         """Test deleting an entity that doesn't exist."""
-        response = test_client.delete("/api/entities/nonexistent-id")
+        response = await async_test_client.delete("/api/entities/nonexistent-id")
         assert response.status_code == 404
 
-    def test_create_entity_missing_required_fields(self, test_client: TestClient):
+    async def test_create_entity_missing_required_fields(self, async_test_client: AsyncClient):
         """Test creating entity with missing required fields."""
         invalid_data = {
             "type": "grant"
             # Missing name, start_date, amount
         }
         
-        response = test_client.post(
+        response = await async_test_client.post(
             "/api/entities/",
             json={"entity": invalid_data}
         )
         assert response.status_code == 422  # Validation error
 
-    def test_create_entity_invalid_type(self, test_client: TestClient):
+    async def test_create_entity_invalid_type(self, async_test_client: AsyncClient):
         """Test creating entity with invalid type."""
         invalid_data = {
             "type": "invalid_type",
@@ -302,33 +299,33 @@ class TestEntityErrorHandling:
             "start_date": "2024-01-01"
         }
         
-        response = test_client.post(
+        response = await async_test_client.post(
             "/api/entities/",
             json={"entity": invalid_data}
         )
         assert response.status_code == 422
 
-    def test_malformed_json_request(self, test_client: TestClient):
+    async def test_malformed_json_request(self, async_test_client: AsyncClient):
         """Test handling of malformed JSON requests."""
-        response = test_client.post(
+        response = await async_test_client.post(
             "/api/entities/",
             content="invalid json",
             headers={"Content-Type": "application/json"}
         )
         assert response.status_code == 422
 
-    def test_invalid_pagination_parameters(self, test_client: TestClient):
+    async def test_invalid_pagination_parameters(self, async_test_client: AsyncClient):
         """Test invalid pagination parameters."""
         # Negative page
-        response = test_client.get("/api/entities/?page=-1")
+        response = await async_test_client.get("/api/entities/?page=-1")
         assert response.status_code == 422
         
         # Zero page size
-        response = test_client.get("/api/entities/?page_size=0")
+        response = await async_test_client.get("/api/entities/?page_size=0")
         assert response.status_code == 422
         
         # Oversized page
-        response = test_client.get("/api/entities/?page_size=1000")
+        response = await async_test_client.get("/api/entities/?page_size=1000")
         assert response.status_code == 422
 
 
@@ -354,31 +351,29 @@ class TestAsyncEntityEndpoints:
         assert data["success"] is True
 
 
+@pytest.mark.asyncio
 class TestEntityPerformance:
     """Performance tests for entity endpoints."""
 
-    def test_list_many_entities_performance(self, test_client: TestClient, performance_test_entities: list):
+    async def test_list_many_entities_performance(self, async_test_client: AsyncClient, performance_test_entities: list):
         """Test performance when listing many entities."""
-        import time
-        
-        start_time = time.time()
-        response = test_client.get("/api/entities/?page_size=100")
-        end_time = time.time()
+        start = time.perf_counter_ns()
+        response = await async_test_client.get("/api/entities/?page_size=100")
+        elapsed = time.perf_counter_ns() - start
         
         assert response.status_code == 200
-        assert (end_time - start_time) < 2.0  # Should complete within 2 seconds
+        assert elapsed < PERF_BUDGETS["list_100"]
 
-    def test_bulk_operations_performance(self, test_client: TestClient, performance_test_entities: list):
+    async def test_bulk_operations_performance(self, async_test_client: AsyncClient, performance_test_entities: list):
         """Test performance of bulk operations."""
         entity_ids = [entity.id for entity in performance_test_entities[:10]]
         
-        import time
-        start_time = time.time()
-        response = test_client.post(
+        start = time.perf_counter_ns()
+        response = await async_test_client.post(
             "/api/entities/bulk-delete",
             json={"ids": entity_ids}
         )
-        end_time = time.time()
+        elapsed = time.perf_counter_ns() - start
         
         assert response.status_code == 200
-        assert (end_time - start_time) < 5.0  # Should complete within 5 seconds
\ No newline at end of file
+        assert elapsed < PERF_BUDGETS["bulk_delete_10"]
\ No newline at end of file
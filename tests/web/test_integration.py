@@ -4,11 +4,61 @@ Tests complete workflows and API interactions.
 """
 
 import asyncio
-import json
+import time
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
 
+from .conftest import recv_json
+
+
+# Status codes accepted from successful reads and creates
+_OK_STATUS = frozenset({200, 201})
+
+# Performance budgets in nanoseconds, keyed by scenario
+PERF_BUDGETS = {
+    "list_100": 2_000_000_000,
+    "kpis": 3_000_000_000,
+    "forecast_12": 5_000_000_000,
+    "user_workflow_avg": 10_000_000_000,
+}
+
+
+VALID_GRANT = {
+    "type": "grant",
+    "name": "Valid Grant",
+    "start_date": "2024-01-01",
+    "amount": 500000
+}
+
+INVALID_GRANT = {
+    "type": "grant",
+    "name": "",  # Invalid: empty name
+    "start_date": "invalid-date",
+    "amount": -1000  # Invalid: negative amount
+}
+
+
+@pytest.fixture(scope="session")
+def validation_results(test_client: TestClient) -> dict:
+    """Validate the canonical valid and invalid grants once per session."""
+    results = {}
+    for key, entity in (("valid", VALID_GRANT), ("invalid", INVALID_GRANT)):
+        response = test_client.post("/api/entities/validate", json={"entity": entity})
+        assert response.status_code == 200
+        results[key] = response.json()["validation"]
+    return results
+
+
+@pytest.fixture(scope="session")
+def kpis_cached(test_client: TestClient, seeded_entities: dict) -> dict:
+    """Recalculate KPIs over the seeded entities and fetch them once per session."""
+    recalc_response = test_client.post("/api/calculations/kpis/recalculate")
+    assert recalc_response.status_code == 200
+    kpis_response = test_client.get("/api/calculations/kpis")
+    assert kpis_response.status_code == 200
+    return kpis_response.json()
+
 
 class TestEntityWorkflow:
     """Test complete entity management workflow."""
@@ -24,20 +74,14 @@ class TestEntityWorkflow:
         created_entity = create_response.json()["entity"]
         entity_id = created_entity["id"]
         
-        # 2. Verify entity appears in list
-        list_response = test_client.get("/api/entities/")
-        assert list_response.status_code == 200
-        entities = list_response.json()["entities"]
-        assert any(e["id"] == entity_id for e in entities)
-        
-        # 3. Get specific entity
+        # 2. Get specific entity
         get_response = test_client.get(f"/api/entities/{entity_id}")
         assert get_response.status_code == 200
         retrieved_entity = get_response.json()["entity"]
         assert retrieved_entity["id"] == entity_id
         assert retrieved_entity["name"] == sample_grant_data["name"]
         
-        # 4. Update entity
+        # 3. Update entity
         updated_data = {"name": "Updated Grant Name", "amount": 600000}
         update_response = test_client.put(
             f"/api/entities/{entity_id}",
@@ -48,56 +92,48 @@ class TestEntityWorkflow:
         assert updated_entity["name"] == "Updated Grant Name"
         assert updated_entity["amount"] == 600000
         
-        # 5. Verify update in list
-        list_response = test_client.get("/api/entities/")
-        entities = list_response.json()["entities"]
-        updated_in_list = next(e for e in entities if e["id"] == entity_id)
-        assert updated_in_list["name"] == "Updated Grant Name"
+        # Confirm the update persisted with a single targeted read
+        get_response = test_client.get(f"/api/entities/{entity_id}")
+        assert get_response.json()["entity"]["name"] == "Updated Grant Name"
         
-        # 6. Delete entity
+        # 4. Delete entity
         delete_response = test_client.delete(f"/api/entities/{entity_id}")
         assert delete_response.status_code == 200
         
-        # 7. Verify entity is deleted
+        # 5. Verify entity is deleted
         get_response = test_client.get(f"/api/entities/{entity_id}")
         assert get_response.status_code == 404
 
-    def test_entity_validation_workflow(self, test_client: TestClient):
+    def test_entity_appears_in_listing(self, test_client: TestClient, sample_grant_data: dict):
+        """Test that a newly created entity shows up in the entity list."""
+        create_response = test_client.post(
+            "/api/entities/",
+            json={"entity": sample_grant_data}
+        )
+        assert create_response.status_code == 201
+        entity_id = create_response.json()["entity"]["id"]
+        
+        list_response = test_client.get("/api/entities/")
+        assert list_response.status_code == 200
+        entities = list_response.json()["entities"]
+        assert any(e["id"] == entity_id for e in entities)
+        
+        # Clean up
+        test_client.delete(f"/api/entities/{entity_id}")
+
+    def test_entity_validation_workflow(self, validation_results: dict):
         """Test entity validation workflow."""
         # Test valid entity
-        valid_data = {
-            "type": "grant",
-            "name": "Valid Grant",
-            "start_date": "2024-01-01",
-            "amount": 500000
-        }
-        
-        validation_response = test_client.post(
-            "/api/entities/validate",
-            json={"entity": valid_data}
-        )
-        assert validation_response.status_code == 200
-        validation = validation_response.json()["validation"]
+        validation = validation_results["valid"]
         assert validation["valid"] is True
         
         # Test invalid entity
-        invalid_data = {
-            "type": "grant",
-            "name": "",  # Invalid: empty name
-            "start_date": "invalid-date",
-            "amount": -1000  # Invalid: negative amount
-        }
-        
-        validation_response = test_client.post(
-            "/api/entities/validate",
-            json={"entity": invalid_data}
-        )
-        assert validation_response.status_code == 200
-        validation = validation_response.json()["validation"]
+        validation = validation_results["invalid"]
         assert validation["valid"] is False
         assert len(validation["errors"]) > 0
 
-    def test_entity_search_workflow(self, test_client: TestClient):
+    @pytest.mark.asyncio
+    async def test_entity_search_workflow(self, async_test_client: AsyncClient):
         """Test entity search and filtering workflow."""
         # Create multiple entities with different attributes
         entities_data = [
@@ -127,20 +163,21 @@ class TestEntityWorkflow:
             }
         ]
         
-        created_ids = []
-        for entity_data in entities_data:
-            response = test_client.post("/api/entities/", json={"entity": entity_data})
-            created_ids.append(response.json()["entity"]["id"])
+        responses = await asyncio.gather(*[
+            async_test_client.post("/api/entities/", json={"entity": entity_data})
+            for entity_data in entities_data
+        ])
+        created_ids = [response.json()["entity"]["id"] for response in responses]
         
         # Test filtering by type
-        response = test_client.get("/api/entities/?entity_type=grant")
+        response = await async_test_client.get("/api/entities/?entity_type=grant")
         assert response.status_code == 200
         grants = response.json()["entities"]
         assert len(grants) >= 2
         assert all(e["type"] == "grant" for e in grants)
         
         # Test search functionality
-        search_response = test_client.post(
+        search_response = await async_test_client.post(
             "/api/entities/search",
             json={"query": "NASA", "fields": ["name", "agency"]}
         )
@@ -149,32 +186,18 @@ class TestEntityWorkflow:
         assert len(nasa_entities) >= 1
         
         # Clean up
-        for entity_id in created_ids:
-            test_client.delete(f"/api/entities/{entity_id}")
+        await asyncio.gather(*[
+            async_test_client.delete(f"/api/entities/{entity_id}")
+            for entity_id in created_ids
+        ])
 
 
 class TestCalculationWorkflow:
     """Test calculation and analysis workflow."""
 
-    def test_kpi_calculation_workflow(self, test_client: TestClient, sample_grant_data: dict, sample_employee_data: dict):
+    def test_kpi_calculation_workflow(self, kpis_cached: dict):
         """Test KPI calculation workflow with entities."""
-        # Create some entities first
-        test_client.post("/api/entities/", json={"entity": sample_grant_data})
-        test_client.post("/api/entities/", json={"entity": sample_employee_data})
-        
-        # Get initial KPIs
-        kpi_response = test_client.get("/api/calculations/kpis")
-        assert kpi_response.status_code == 200
-        initial_kpis = kpi_response.json()["kpis"]
-        
-        # Recalculate KPIs
-        recalc_response = test_client.post("/api/calculations/kpis/recalculate")
-        assert recalc_response.status_code == 200
-        
-        # Get updated KPIs
-        updated_kpi_response = test_client.get("/api/calculations/kpis")
-        assert updated_kpi_response.status_code == 200
-        updated_kpis = updated_kpi_response.json()["kpis"]
+        updated_kpis = kpis_cached["kpis"]
         
         # KPIs should be available
         assert isinstance(updated_kpis, list)
@@ -248,45 +271,37 @@ class TestCalculationWorkflow:
         test_client.delete("/api/scenarios/integration_test_scenario")
 
 
+# The sync WebSocket session blocks forever on a missing frame, so bound the
+# whole test, handshake included
+@pytest.mark.timeout(5)
 class TestWebSocketWorkflow:
     """Test WebSocket integration workflow."""
 
-    def test_websocket_entity_updates(self, test_client: TestClient, sample_grant_data: dict):
+    def test_websocket_entity_updates(self, test_client: TestClient, ws_entities):
         """Test WebSocket notifications for entity updates."""
-        # Connect to WebSocket
-        with test_client.websocket_connect("/ws/entities") as websocket:
-            # Receive welcome message
-            welcome_data = websocket.receive_text()
-            welcome_msg = json.loads(welcome_data)
-            assert welcome_msg["type"] == "connected"
-            
-            # Create an entity (this should trigger WebSocket notification)
-            create_response = test_client.post(
-                "/api/entities/",
-                json={"entity": sample_grant_data}
-            )
-            entity_id = create_response.json()["entity"]["id"]
-            
-            # Update entity (should trigger notification)
-            test_client.put(
-                f"/api/entities/{entity_id}",
-                json={"entity": {"name": "Updated via WebSocket Test"}}
-            )
-            
-            # Clean up
-            test_client.delete(f"/api/entities/{entity_id}")
+        # Broadcast an entity event directly; entity CRUD is covered elsewhere
+        broadcast_response = test_client.post(
+            "/api/websockets/test-broadcast",
+            params={"message_type": "entity_created", "topic": "entities"}
+        )
+        assert broadcast_response.status_code == 200
+        
+        # The subscriber should receive it
+        update_msg = recv_json(ws_entities)
+        assert update_msg["type"] == "entity_created"
 
-    def test_websocket_calculation_updates(self, test_client: TestClient):
+    def test_websocket_calculation_updates(self, test_client: TestClient, ws_calculations):
         """Test WebSocket notifications for calculation updates."""
-        with test_client.websocket_connect("/ws/calculations") as websocket:
-            # Receive welcome message
-            welcome_data = websocket.receive_text()
-            welcome_msg = json.loads(welcome_data)
-            assert welcome_msg["type"] == "connected"
-            
-            # Trigger calculation (should send progress updates)
-            calc_response = test_client.post("/api/calculations/kpis/recalculate")
-            assert calc_response.status_code == 200
+        # Broadcast a progress event directly; recalculation is covered by the KPI workflow
+        broadcast_response = test_client.post(
+            "/api/websockets/test-broadcast",
+            params={"message_type": "calculation_progress", "topic": "calculations"}
+        )
+        assert broadcast_response.status_code == 200
+        
+        # The subscriber should receive it
+        update_msg = recv_json(ws_calculations)
+        assert update_msg["type"] == "calculation_progress"
 
     def test_websocket_broadcast_system(self, test_client: TestClient):
         """Test WebSocket broadcast functionality."""
@@ -299,36 +314,21 @@ class TestWebSocketWorkflow:
         broadcast_data = broadcast_response.json()
         assert broadcast_data["success"] is True
 
-    def test_websocket_connection_management(self, test_client: TestClient):
+    def test_websocket_connection_management(self, test_client: TestClient, ws_status):
         """Test WebSocket connection management."""
-        # Check initial stats
+        # Check stats with a status connection open
         stats_response = test_client.get("/api/websockets/stats")
         assert stats_response.status_code == 200
-        initial_stats = stats_response.json()
-        
-        # Connect to WebSocket
-        with test_client.websocket_connect("/ws/status") as websocket:
-            websocket.receive_text()  # Welcome message
-            
-            # Check stats with connection
-            stats_response = test_client.get("/api/websockets/stats")
-            current_stats = stats_response.json()
-            # Note: In test environment, stats might not update immediately
-            assert "total_connections" in current_stats
+        current_stats = stats_response.json()
+        # Note: In test environment, stats might not update immediately
+        assert "total_connections" in current_stats
 
 
 class TestReportsWorkflow:
     """Test report generation workflow."""
 
-    def test_report_generation_workflow(self, test_client: TestClient, sample_grant_data: dict, sample_employee_data: dict):
+    def test_report_generation_workflow(self, test_client: TestClient, seeded_entities: dict):
         """Test complete report generation workflow."""
-        # Create entities for reporting
-        grant_response = test_client.post("/api/entities/", json={"entity": sample_grant_data})
-        employee_response = test_client.post("/api/entities/", json={"entity": sample_employee_data})
-        
-        grant_id = grant_response.json()["entity"]["id"]
-        employee_id = employee_response.json()["entity"]["id"]
-        
         # Generate cash flow report
         cashflow_response = test_client.post(
             "/api/reports/cashflow",
@@ -349,28 +349,21 @@ class TestReportsWorkflow:
             json={"format": "json"}
         )
         assert summary_response.status_code == 200
-        
-        # Clean up
-        test_client.delete(f"/api/entities/{grant_id}")
-        test_client.delete(f"/api/entities/{employee_id}")
 
-    def test_report_export_workflow(self, test_client: TestClient):
+    @pytest.mark.parametrize("fmt", ["json", "csv"])
+    def test_report_export_workflow(self, test_client: TestClient, fmt: str):
         """Test report export functionality."""
-        # Test different export formats
-        formats = ["json", "csv"]
-        
-        for fmt in formats:
-            export_response = test_client.post(
-                "/api/reports/export",
-                json={
-                    "report_type": "summary",
-                    "format": fmt,
-                    "include_charts": False
-                }
-            )
-            assert export_response.status_code == 200
-            export_data = export_response.json()
-            assert export_data["success"] is True
+        export_response = test_client.post(
+            "/api/reports/export",
+            json={
+                "report_type": "summary",
+                "format": fmt,
+                "include_charts": False
+            }
+        )
+        assert export_response.status_code == 200
+        export_data = export_response.json()
+        assert export_data["success"] is True
 
 
 class TestErrorHandlingWorkflow:
@@ -464,7 +457,7 @@ class TestAsyncIntegrationWorkflow:
         results = await asyncio.gather(*create_tasks)
         
         # All operations should succeed
-        assert all(r.status_code in [200, 201] for r in results)
+        assert all(r.status_code in _OK_STATUS for r in results)
         
         # Clean up created entities
         entity_ids = []
@@ -483,83 +476,70 @@ class TestAsyncIntegrationWorkflow:
             assert all(r.status_code == 200 for r in delete_results)
 
 
+@pytest.mark.slow
 class TestPerformanceIntegration:
     """Integration performance tests."""
 
-    def test_api_response_times(self, test_client: TestClient, performance_test_entities: list):
+    @pytest.mark.asyncio
+    async def test_api_response_times(self, async_test_client: AsyncClient, performance_test_entities: list):
         """Test API response times under load."""
-        import time
-        
-        # Test entity listing performance
-        start_time = time.time()
-        list_response = test_client.get("/api/entities/?page_size=100")
-        list_time = time.time() - start_time
+        async def timed(coro):
+            start_time = time.perf_counter_ns()
+            response = await coro
+            return response, time.perf_counter_ns() - start_time
+        
+        # The endpoints are independent, so request them concurrently
+        (list_response, list_time), (kpi_response, kpi_time), (forecast_response, forecast_time) = await asyncio.gather(
+            timed(async_test_client.get("/api/entities/?page_size=100")),
+            timed(async_test_client.get("/api/calculations/kpis")),
+            timed(async_test_client.get("/api/calculations/forecast?months=12"))
+        )
         
+        # Entity listing performance
         assert list_response.status_code == 200
-        assert list_time < 2.0  # Should complete within 2 seconds
-        
-        # Test KPI calculation performance
-        start_time = time.time()
-        kpi_response = test_client.get("/api/calculations/kpis")
-        kpi_time = time.time() - start_time
+        assert list_time < PERF_BUDGETS["list_100"]
         
+        # KPI calculation performance
         assert kpi_response.status_code == 200
-        assert kpi_time < 3.0  # Should complete within 3 seconds
-        
-        # Test forecast performance
-        start_time = time.time()
-        forecast_response = test_client.get("/api/calculations/forecast?months=12")
-        forecast_time = time.time() - start_time
+        assert kpi_time < PERF_BUDGETS["kpis"]
         
+        # Forecast performance
         assert forecast_response.status_code == 200
-        assert forecast_time < 5.0  # Should complete within 5 seconds
+        assert forecast_time < PERF_BUDGETS["forecast_12"]
 
-    def test_concurrent_user_simulation(self, test_client: TestClient):
+    @pytest.mark.asyncio
+    async def test_concurrent_user_simulation(self, async_test_client: AsyncClient):
         """Simulate multiple concurrent users."""
-        import threading
-        import time
-        
-        results = []
-        errors = []
-        
-        def user_simulation():
-            try:
-                # Simulate typical user workflow
-                start_time = time.time()
-                
-                # List entities
-                list_resp = test_client.get("/api/entities/")
-                assert list_resp.status_code == 200
-                
-                # Get KPIs
-                kpi_resp = test_client.get("/api/calculations/kpis")
-                assert kpi_resp.status_code == 200
-                
-                # Get forecast
-                forecast_resp = test_client.get("/api/calculations/forecast?months=6")
-                assert forecast_resp.status_code == 200
-                
-                end_time = time.time()
-                results.append(end_time - start_time)
-                
-            except Exception as e:
-                errors.append(str(e))
+        async def user_simulation():
+            # Simulate typical user workflow
+            start_time = time.perf_counter_ns()
+            
+            # List entities
+            list_resp = await async_test_client.get("/api/entities/")
+            assert list_resp.status_code == 200
+            
+            # Get KPIs
+            kpi_resp = await async_test_client.get("/api/calculations/kpis")
+            assert kpi_resp.status_code == 200
+            
+            # Get forecast
+            forecast_resp = await async_test_client.get("/api/calculations/forecast?months=6")
+            assert forecast_resp.status_code == 200
+            
+            return time.perf_counter_ns() - start_time
         
         # Run 5 concurrent user simulations
-        threads = []
-        for i in range(5):
-            thread = threading.Thread(target=user_simulation)
-            threads.append(thread)
-            thread.start()
-        
-        # Wait for all to complete
-        for thread in threads:
-            thread.join(timeout=10.0)  # 10 second timeout
+        outcomes = await asyncio.gather(
+            *[user_simulation() for _ in range(5)],
+            return_exceptions=True
+        )
+        errors = [str(o) for o in outcomes if isinstance(o, Exception)]
+        results = [o for o in outcomes if not isinstance(o, Exception)]
         
         # Check results
         assert len(errors) == 0, f"Errors occurred: {errors}"
         assert len(results) > 0, "No successful requests completed"
         
         # Average response time should be reasonable
-        avg_time = sum(results) / len(results)
-        assert avg_time < 10.0, f"Average response time too high: {avg_time}s"
\ No newline at end of file
+        avg_time = sum(results) // len(results)
+        assert avg_time < PERF_BUDGETS["user_workflow_avg"], f"Average response time too high: {avg_time}ns"
@@ -4,10 +4,54 @@ Tests for WebSocket functionality.
 
 import asyncio
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Union
+
+import orjson
 import pytest
 from fastapi.testclient import TestClient
 from fastapi.websockets import WebSocketDisconnect
 
+from cashcow.web.api.websockets.handlers import _receive_messages
+
+from .conftest import recv_json
+
+
+# Fixed-shape frames are formatted by hand rather than encoded, so no dict
+# is built and no JSON encoder runs. Values must be plain ASCII that needs
+# no escaping. Free-form frames come from orjson.dumps. Both are sent as
+# binary frames, which the endpoints accept alongside text frames.
+_HEARTBEAT_FRAME = b'{"type":"heartbeat","timestamp":1234567890}'
+
+
+def _topic_frame(message_type: str, topic: str) -> bytes:
+    """Subscribe or unsubscribe frame for ``topic``."""
+    return f'{{"type":"{message_type}","topic":"{topic}"}}'.encode()
+
+
+def _skip(websocket, n: int = 1) -> None:
+    """Discard the next ``n`` frames without decoding them."""
+    recv = websocket.receive_text
+    for _ in range(n):
+        recv()
+
+
+# Keep these tests on one xdist worker so they share its app and connection
+# manager; other modules spread across the remaining workers. The sync
+# WebSocket session blocks forever on a missing frame, so each test is
+# bounded, handshake included
+pytestmark = [pytest.mark.xdist_group("websockets"), pytest.mark.timeout(5)]
+
+
+# Performance budgets in nanoseconds, keyed by scenario
+PERF_BUDGETS = {
+    "connect": 1_000_000_000,
+    "throughput_100": 2_000_000_000,  # 50 messages per second
+    "concurrent_connect_avg": 2_000_000_000,
+}
+
 
 class TestWebSocketEndpoints:
     """Test WebSocket connection and messaging."""
@@ -16,78 +60,51 @@ class TestWebSocketEndpoints:
         """Test WebSocket status endpoint connection."""
         with test_client.websocket_connect("/ws/status") as websocket:
             # Should receive welcome message
-            data = websocket.receive_text()
-            message = json.loads(data)
+            message = recv_json(websocket)
             assert message["type"] == "connected"
             assert "connection_id" in message["data"]
 
     def test_websocket_connection_entities(self, test_client: TestClient):
         """Test WebSocket entities endpoint connection."""
         with test_client.websocket_connect("/ws/entities") as websocket:
-            data = websocket.receive_text()
-            message = json.loads(data)
+            message = recv_json(websocket)
             assert message["type"] == "connected"
             assert message["data"]["topic"] == "entities"
 
     def test_websocket_connection_calculations(self, test_client: TestClient):
         """Test WebSocket calculations endpoint connection."""
         with test_client.websocket_connect("/ws/calculations") as websocket:
-            data = websocket.receive_text()
-            message = json.loads(data)
+            message = recv_json(websocket)
             assert message["type"] == "connected"
             assert message["data"]["topic"] == "calculations"
 
-    def test_websocket_heartbeat(self, test_client: TestClient):
+    def test_websocket_heartbeat(self, ws_status):
         """Test WebSocket heartbeat mechanism."""
-        with test_client.websocket_connect("/ws/status") as websocket:
-            # Receive welcome message
-            websocket.receive_text()
-            
-            # Send heartbeat
-            heartbeat_msg = {"type": "heartbeat", "timestamp": 1234567890}
-            websocket.send_text(json.dumps(heartbeat_msg))
-            
-            # Should receive heartbeat response
-            response = websocket.receive_text()
-            message = json.loads(response)
-            assert message["type"] == "heartbeat_ack"
+        # Send heartbeat
+        ws_status.send_bytes(_HEARTBEAT_FRAME)
+        
+        # Should receive heartbeat response
+        message = recv_json(ws_status)
+        assert message["type"] == "heartbeat_ack"
 
-    def test_websocket_subscription_management(self, test_client: TestClient):
+    def test_websocket_subscription_management(self, ws_status):
         """Test WebSocket subscription management."""
-        with test_client.websocket_connect("/ws/status") as websocket:
-            # Skip welcome message
-            websocket.receive_text()
-            
-            # Send subscription request
-            subscribe_msg = {
-                "type": "subscribe",
-                "topic": "kpi_updates"
-            }
-            websocket.send_text(json.dumps(subscribe_msg))
-            
-            # Should receive subscription confirmation
-            response = websocket.receive_text()
-            message = json.loads(response)
-            assert message["type"] == "subscribed"
-            assert message["data"]["topic"] == "kpi_updates"
+        # Send subscription request
+        ws_status.send_bytes(_topic_frame("subscribe", "kpi_updates"))
+        
+        # Should receive subscription confirmation
+        message = recv_json(ws_status)
+        assert message["type"] == "subscribed"
+        assert message["data"]["topic"] == "kpi_updates"
 
-    def test_websocket_unsubscribe(self, test_client: TestClient):
+    def test_websocket_unsubscribe(self, ws_status):
         """Test WebSocket unsubscription."""
-        with test_client.websocket_connect("/ws/status") as websocket:
-            websocket.receive_text()  # Skip welcome
-            
-            # Subscribe first
-            subscribe_msg = {"type": "subscribe", "topic": "test_topic"}
-            websocket.send_text(json.dumps(subscribe_msg))
-            websocket.receive_text()  # Skip subscription confirmation
-            
-            # Then unsubscribe
-            unsubscribe_msg = {"type": "unsubscribe", "topic": "test_topic"}
-            websocket.send_text(json.dumps(unsubscribe_msg))
-            
-            response = websocket.receive_text()
-            message = json.loads(response)
-            assert message["type"] == "unsubscribed"
+        # Pipeline subscribe and unsubscribe, then collect both acks in order
+        ws_status.send_bytes(_topic_frame("subscribe", "test_topic"))
+        ws_status.send_bytes(_topic_frame("unsubscribe", "test_topic"))
+        
+        assert recv_json(ws_status)["type"] == "subscribed"
+        assert recv_json(ws_status)["type"] == "unsubscribed"
 
     def test_websocket_broadcast_functionality(self, test_client: TestClient):
         """Test WebSocket broadcast functionality."""
@@ -112,62 +129,44 @@ class TestWebSocketEndpoints:
         assert "connections" in data
         assert isinstance(data["total_connections"], int)
 
-    def test_websocket_invalid_message_handling(self, test_client: TestClient):
+    def test_websocket_invalid_message_handling(self, ws_status):
         """Test handling of invalid WebSocket messages."""
-        with test_client.websocket_connect("/ws/status") as websocket:
-            websocket.receive_text()  # Skip welcome
-            
-            # Send invalid JSON
-            websocket.send_text("invalid json")
-            
-            # Connection should remain open (server handles gracefully)
-            # Send valid message to verify connection is still active
-            valid_msg = {"type": "heartbeat", "timestamp": 1234567890}
-            websocket.send_text(json.dumps(valid_msg))
-            
-            response = websocket.receive_text()
-            message = json.loads(response)
-            assert message["type"] == "heartbeat_ack"
+        # Send invalid JSON
+        ws_status.send_bytes(b"invalid json")
+        
+        # Connection should remain open (server handles gracefully)
+        # Send valid message to verify connection is still active
+        ws_status.send_bytes(_HEARTBEAT_FRAME)
+        
+        message = recv_json(ws_status)
+        assert message["type"] == "heartbeat_ack"
 
     def test_multiple_websocket_connections(self, test_client: TestClient):
         """Test multiple simultaneous WebSocket connections."""
-        connections = []
-        
-        try:
+        with ExitStack() as stack:
             # Create multiple connections
-            for i in range(3):
-                ws = test_client.websocket_connect("/ws/status")
-                connection = ws.__enter__()
-                connections.append((ws, connection))
-                
-                # Receive welcome message
-                data = connection.receive_text()
-                message = json.loads(data)
+            connections = [
+                stack.enter_context(test_client.websocket_connect("/ws/status"))
+                for _ in range(3)
+            ]
+            
+            # Receive welcome messages
+            for connection in connections:
+                message = recv_json(connection)
                 assert message["type"] == "connected"
             
             # All connections should be independent
             assert len(connections) == 3
-            
-        finally:
-            # Clean up connections
-            for ws_context, connection in connections:
-                try:
-                    ws_context.__exit__(None, None, None)
-                except:
-                    pass
 
-    def test_websocket_message_ordering(self, test_client: TestClient):
+    def test_websocket_message_ordering(self, ws_status):
         """Test that WebSocket messages are received in order."""
-        with test_client.websocket_connect("/ws/status") as websocket:
-            websocket.receive_text()  # Skip welcome
-            
-            # Send multiple messages rapidly
-            for i in range(5):
-                msg = {"type": "test", "sequence": i}
-                websocket.send_text(json.dumps(msg))
-            
-            # WebSocket should handle all messages
-            # (Note: This is a basic test - actual ordering depends on implementation)
+        # Send multiple messages rapidly
+        payloads = [f'{{"type":"test","sequence":{i}}}' for i in range(5)]
+        for payload in payloads:
+            ws_status.send_text(payload)
+        
+        # WebSocket should handle all messages
+        # (Note: This is a basic test - actual ordering depends on implementation)
 
     def test_websocket_connection_limit(self, test_client: TestClient):
         """Test WebSocket connection behavior under load."""
@@ -177,31 +176,37 @@ class TestWebSocketEndpoints:
         connections = []
         max_connections = 10
         
-        try:
-            for i in range(max_connections):
+        def connect():
+            # Handshakes run concurrently; cleanup is registered by the caller
+            session = test_client.websocket_connect("/ws/status")
+            return session, session.__enter__()
+        
+        with ExitStack() as stack:
+            with ThreadPoolExecutor(max_workers=max_connections) as executor:
+                futures = [executor.submit(connect) for _ in range(max_connections)]
+            
+            # Every handshake has finished, so register all opened sessions
+            # before an unexpected error below can unwind the stack
+            for future in futures:
+                if future.exception() is None:
+                    session, connection = future.result()
+                    stack.push(session.__exit__)
+                    connections.append(connection)
+            
+            for future in futures:
                 try:
-                    ws = test_client.websocket_connect("/ws/status")
-                    connection = ws.__enter__()
-                    connections.append((ws, connection))
-                    
-                    # Just verify connection works
-                    data = connection.receive_text()
-                    message = json.loads(data)
-                    assert message["type"] == "connected"
-                    
-                except Exception as e:
+                    future.result()
+                except (WebSocketDisconnect, RuntimeError):
                     # Some connections might fail under load - that's expected
-                    break
+                    pass
+            
+            # Just verify each connection works
+            for connection in connections:
+                message = recv_json(connection)
+                assert message["type"] == "connected"
             
             # Should have established at least some connections
             assert len(connections) > 0
-            
-        finally:
-            for ws_context, connection in connections:
-                try:
-                    ws_context.__exit__(None, None, None)
-                except:
-                    pass
 
 
 class TestWebSocketErrorHandling:
@@ -209,70 +214,129 @@ class TestWebSocketErrorHandling:
 
     def test_websocket_connection_rejection(self, test_client: TestClient):
         """Test WebSocket connection rejection scenarios."""
-        # Test invalid endpoint
-        try:
+        # Test invalid endpoint; the router closes the handshake
+        with pytest.raises(WebSocketDisconnect):
             with test_client.websocket_connect("/ws/invalid"):
                 pass
-        except Exception:
-            # Should raise an exception for invalid endpoint
-            pass
 
-    def test_websocket_disconnect_handling(self, test_client: TestClient):
+    def test_websocket_disconnect_handling(self, ws_status):
         """Test proper handling of WebSocket disconnections."""
-        with test_client.websocket_connect("/ws/status") as websocket:
-            websocket.receive_text()  # Welcome message
-            
-            # Send a message then close
-            msg = {"type": "test", "data": "disconnect_test"}
-            websocket.send_text(json.dumps(msg))
-            
-            # Close connection (handled by context manager)
+        # Send a message then close
+        msg = {"type": "test", "data": "disconnect_test"}
+        ws_status.send_bytes(orjson.dumps(msg))
+        
+        # Close connection (handled by the fixture)
 
-    def test_websocket_malformed_subscription(self, test_client: TestClient):
+    def test_websocket_malformed_subscription(self, ws_status):
         """Test handling of malformed subscription requests."""
-        with test_client.websocket_connect("/ws/status") as websocket:
-            websocket.receive_text()  # Skip welcome
-            
-            # Send malformed subscription
-            malformed_msg = {"type": "subscribe"}  # Missing topic
-            websocket.send_text(json.dumps(malformed_msg))
-            
-            # Should receive error message or handle gracefully
-            try:
-                response = websocket.receive_text()
-                message = json.loads(response)
-                # Server should either send error or ignore invalid request
-                assert "type" in message
-            except:
-                # Connection might close on invalid request - that's also valid
-                pass
+        # Send malformed subscription
+        malformed_msg = {"type": "subscribe"}  # Missing topic
+        ws_status.send_bytes(orjson.dumps(malformed_msg))
+        
+        # Should receive error message or handle gracefully
+        try:
+            message = recv_json(ws_status)
+            # Server should either send error or ignore invalid request
+            assert "type" in message
+        except WebSocketDisconnect:
+            # Connection might close on invalid request - that's also valid
+            pass
+
+
+class _FrameWebSocket:
+    """Stand-in for a server WebSocket whose receive() returns one frame."""
+
+    def __init__(self, data: Union[str, bytes]):
+        key = "bytes" if isinstance(data, bytes) else "text"
+        self.frame = {"type": "websocket.receive", key: data}
+
+    async def receive(self) -> dict:
+        return self.frame
+
+
+@pytest.mark.asyncio
+class TestReceiveMessages:
+    """Test frame parsing in the WebSocket endpoints, without a connection."""
+
+    async def test_single_document(self):
+        """Test a pretty-printed document is one message, not a batch."""
+        frame = '{\n  "type": "subscribe",\n  "data": {"topic": "kpis"}\n}'
+        messages = await _receive_messages(_FrameWebSocket(frame))
+        assert messages == [{"type": "subscribe", "data": {"topic": "kpis"}}]
+
+    async def test_newline_delimited_batch(self):
+        """Test each line of a batch is a message, in order."""
+        frame = '{"type":"subscribe"}\n{"type":"heartbeat"}\n{"type":"unsubscribe"}'
+        messages = await _receive_messages(_FrameWebSocket(frame))
+        assert [m["type"] for m in messages] == ["subscribe", "heartbeat", "unsubscribe"]
+
+    @pytest.mark.parametrize("frame, count", [
+        ('{"type":"heartbeat"}\n', 1),
+        ('{"type":"heartbeat"}\n{"type":"heartbeat"}\n', 2),
+    ])
+    async def test_trailing_newline(self, frame: str, count: int):
+        """Test a trailing newline adds no empty message."""
+        messages = await _receive_messages(_FrameWebSocket(frame))
+        assert messages == [{"type": "heartbeat"}] * count
+
+    @pytest.mark.parametrize("frame", [
+        "invalid json",
+        '{"type":"heartbeat"}\nnot json',
+        '{\n  "type": "heartbeat",\n}',
+    ])
+    async def test_invalid_json_rejects_frame(self, frame: str):
+        """Test a frame with any invalid JSON is rejected as a whole."""
+        with pytest.raises(json.JSONDecodeError) as excinfo:
+            await _receive_messages(_FrameWebSocket(frame))
+        # The error points into the frame, not into one of its lines
+        assert excinfo.value.doc == frame
+
+    @pytest.mark.parametrize("frame", [
+        b'{"type":"subscribe","data":{"topic":"kpis"}}',
+        _HEARTBEAT_FRAME + b"\n" + _topic_frame("unsubscribe", "kpis"),
+    ])
+    async def test_binary_frame_matches_text(self, frame: bytes):
+        """Test a binary frame parses to the same messages as its text."""
+        from_bytes = await _receive_messages(_FrameWebSocket(frame))
+        from_text = await _receive_messages(_FrameWebSocket(frame.decode()))
+        assert from_bytes == from_text
+
+    async def test_binary_frame_invalid_utf8(self):
+        """Test a binary frame that isn't UTF-8 gets a clear error."""
+        with pytest.raises(ValueError, match="not valid UTF-8"):
+            await _receive_messages(_FrameWebSocket(b'{"type":"\xff"}'))
+
+    @pytest.mark.parametrize("frame", ["[1, 2]", '"heartbeat"', "1\n2", '{"type":"heartbeat"}\n[]'])
+    async def test_non_object_rejects_frame(self, frame: str):
+        """Test messages that aren't JSON objects are rejected."""
+        with pytest.raises(ValueError, match="must be JSON objects"):
+            await _receive_messages(_FrameWebSocket(frame))
 
 
 @pytest.mark.asyncio
 class TestAsyncWebSocket:
     """Test async WebSocket functionality."""
     
-    async def test_async_websocket_connection(self, test_app):
+    async def test_async_websocket_connection(self, test_client: TestClient):
         """Test async WebSocket connection."""
-        from fastapi.testclient import TestClient
-        
         # Note: For real async WebSocket testing, we'd use a different approach
-        # This is a simplified test using TestClient
-        client = TestClient(test_app)
-        
-        with client.websocket_connect("/ws/status") as websocket:
-            data = websocket.receive_text()
-            message = json.loads(data)
+        # This is a simplified test using the session TestClient
+        with test_client.websocket_connect("/ws/status") as websocket:
+            message = recv_json(websocket)
             assert message["type"] == "connected"
 
-    async def test_async_websocket_broadcast(self, async_test_client):
-        """Test async WebSocket broadcast functionality."""
-        response = await async_test_client.post(
-            "/api/websockets/test-broadcast?message_type=async_test&topic=status"
+    @pytest.mark.parametrize("n", [1, 10, 50])
+    async def test_async_websocket_broadcast(self, async_test_client, n: int):
+        """Test async WebSocket broadcast functionality under concurrent requests."""
+        url = "/api/websockets/test-broadcast?message_type=async_test&topic=status"
+        # Fan the broadcasts out together to exercise the server's async path
+        responses = await asyncio.gather(
+            *[async_test_client.post(url) for _ in range(n)]
         )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
+        
+        for response in responses:
+            assert response.status_code == 200
+            assert response.json()["success"] is True
 
 
 class TestWebSocketPerformance:
@@ -280,71 +344,59 @@ class TestWebSocketPerformance:
 
     def test_websocket_connection_speed(self, test_client: TestClient):
         """Test WebSocket connection establishment speed."""
-        import time
-        
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         with test_client.websocket_connect("/ws/status") as websocket:
-            websocket.receive_text()  # Welcome message
-            end_time = time.time()
+            _skip(websocket)  # Welcome message
+            elapsed = time.perf_counter_ns() - start_time
         
-        connection_time = end_time - start_time
-        assert connection_time < 1.0  # Should connect within 1 second
+        assert elapsed < PERF_BUDGETS["connect"]
 
-    def test_websocket_message_throughput(self, test_client: TestClient):
+    def test_websocket_message_throughput(self, ws_status):
         """Test WebSocket message throughput."""
-        import time
+        message_count = 100
+        # Format up front into one newline-delimited frame so formatting
+        # isn't timed; the messages are fixed-shape, so no encoder is needed.
+        # A trailing heartbeat is acked only after the server has parsed and
+        # handled every message before it, so its ack closes the timed region
+        batch = b"\n".join(
+            [
+                f'{{"type":"throughput_test","sequence":{i}}}'.encode()
+                for i in range(message_count)
+            ]
+            + [_HEARTBEAT_FRAME]
+        )
+        start_time = time.perf_counter_ns()
         
-        with test_client.websocket_connect("/ws/status") as websocket:
-            websocket.receive_text()  # Skip welcome
-            
-            message_count = 100
-            start_time = time.time()
-            
-            for i in range(message_count):
-                msg = {"type": "throughput_test", "sequence": i}
-                websocket.send_text(json.dumps(msg))
-            
-            end_time = time.time()
-            
-            throughput_time = end_time - start_time
-            messages_per_second = message_count / throughput_time
-            
-            # Should handle at least 50 messages per second
-            assert messages_per_second > 50
+        ws_status.send_bytes(batch)
+        assert recv_json(ws_status)["type"] == "heartbeat_ack"
+        
+        elapsed = time.perf_counter_ns() - start_time
+        
+        assert elapsed < PERF_BUDGETS["throughput_100"]
 
     def test_websocket_concurrent_connections_performance(self, test_client: TestClient):
         """Test performance with concurrent WebSocket connections."""
-        import time
-        import threading
+        def connect_once() -> int:
+            start_time = time.perf_counter_ns()
+            with test_client.websocket_connect("/ws/status") as websocket:
+                _skip(websocket)  # Welcome message
+                return time.perf_counter_ns() - start_time
         
-        results = []
-        
-        def create_connection():
-            try:
-                start_time = time.time()
-                with test_client.websocket_connect("/ws/status") as websocket:
-                    websocket.receive_text()  # Welcome message
-                    end_time = time.time()
-                    results.append(end_time - start_time)
-            except Exception as e:
-                results.append(None)  # Connection failed
-        
-        # Create 5 concurrent connections
-        threads = []
-        for i in range(5):
-            thread = threading.Thread(target=create_connection)
-            threads.append(thread)
-            thread.start()
-        
-        # Wait for all connections to complete
-        for thread in threads:
-            thread.join(timeout=5.0)  # 5 second timeout
+        # httpx has no WebSocket client, so the sync sessions are opened
+        # concurrently on a thread pool
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(connect_once) for _ in range(5)]
         
         # Check results
-        successful_connections = [r for r in results if r is not None]
+        successful_connections = []
+        for future in futures:
+            try:
+                successful_connections.append(future.result())
+            except (WebSocketDisconnect, RuntimeError):
+                # Some connections might fail under load - that's expected
+                pass
         assert len(successful_connections) > 0  # At least some should succeed
         
         # Average connection time should be reasonable
-        if successful_connections:
-            avg_time = sum(successful_connections) / len(successful_connections)
-            assert avg_time < 2.0  # Average should be under 2 seconds
\ No newline at end of file
+        avg_time = sum(successful_connections) // len(successful_connections)
+        assert avg_time < PERF_BUDGETS["concurrent_connect_avg"]